@@ -1,10 +1,181 @@
+import json
+
 from django.contrib import admin
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
 from .models import *
+from .response_cache import bump_version
+
+
+class EstimatedCountPaginator(Paginator):
+    # Below this many rows an exact COUNT(*) is cheap enough
+    estimate_threshold = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            try:
+                sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+            except EmptyResultSet:
+                return 0
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+
+            # psycopg2 decodes the json column itself
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate > self.estimate_threshold:
+                return estimate
+
+        return queryset.count()
+
+
+class SemesterFilter(admin.SimpleListFilter):
+    # Fixed lookups instead of SELECT DISTINCT over the whole schedule
+    title = "Семестр"
+    parameter_name = 'semester'
+
+    def lookups(self, request, model_admin):
+        return [(str(semester), str(semester)) for semester in range(1, 13)]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(semester=self.value())
+
+
+class GroupNumberFilter(admin.SimpleListFilter):
+    # A text input instead of a link for every group
+    title = "Группа"
+    parameter_name = 'group_number'
+    template = 'admin/app/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(group__number=self.value())
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'params': [(name, value) for name, value in changelist.params.items() if name != self.parameter_name],
+        }
+
+
+class DataAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_version()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_version()
+
+
+@admin.register(Direction)
+class DirectionAdmin(DataAdmin):
+    list_display = ('code', 'name')
+    search_fields = ('code', 'name')
+    ordering = ('code',)
+
+
+@admin.register(Syllabus)
+class SyllabusAdmin(DataAdmin):
+    list_display = ('year', 'specialty_code', 'specialty_name', 'direction')
+    list_select_related = ('direction',)
+    list_filter = ('year',)
+    search_fields = ('year', 'specialty_code', 'specialty_name')
+    ordering = ('year', 'specialty_name')
+    autocomplete_fields = ('direction',)
+
+
+@admin.register(Discipline)
+class DisciplineAdmin(DataAdmin):
+    list_display = ('name', 'code', 'cycle', 'syllabus', 'hours_total')
+    list_select_related = ('syllabus',)
+    search_fields = ('name', 'code')
+    ordering = ('name',)
+    autocomplete_fields = ('syllabus',)
+
+
+@admin.register(Lecturer)
+class LecturerAdmin(DataAdmin):
+    list_display = ('surname', 'first_name', 'patronymic')
+    search_fields = ('surname', 'first_name', 'patronymic')
+    ordering = ('surname', 'first_name')
+
+
+@admin.register(Group)
+class GroupAdmin(DataAdmin):
+    list_display = ('number', 'students_count', 'syllabus')
+    list_select_related = ('syllabus',)
+    search_fields = ('number',)
+    ordering = ('number',)
+    autocomplete_fields = ('syllabus',)
+
+
+@admin.register(Classroom)
+class ClassroomAdmin(DataAdmin):
+    list_display = ('number', 'type', 'seats_count')
+    list_filter = ('type',)
+    search_fields = ('number',)
+    ordering = ('number',)
+
+
+@admin.register(Schedule)
+class ScheduleAdmin(DataAdmin):
+    list_display = (
+        'id', 'syllabus', 'semester', 'group', 'even_week', 'week_day',
+        'period', 'discipline', 'lecturer', 'classroom', 'type',
+    )
+    list_select_related = ('syllabus', 'group', 'discipline', 'lecturer', 'classroom')
+    list_filter = (SemesterFilter, 'week_day', GroupNumberFilter)
+    autocomplete_fields = ('syllabus', 'group', 'discipline', 'lecturer', 'classroom')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ArchivedSchedule)
+class ArchivedScheduleAdmin(DataAdmin):
+    # Raw ids without joins: archived rows may point at deleted references
+    list_display = (
+        'id', 'syllabus_id', 'semester', 'group_id', 'even_week', 'week_day',
+        'period', 'discipline_id', 'lecturer_id', 'classroom_id', 'type',
+    )
+    list_filter = (SemesterFilter, 'week_day', GroupNumberFilter)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
-admin.site.register(Direction)
-admin.site.register(Syllabus)
-admin.site.register(Discipline)
-admin.site.register(Lecturer)
-admin.site.register(Group)
-admin.site.register(Classroom)
-admin.site.register(Schedule)
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'progress', 'attempts', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    readonly_fields = (
+        'status', 'progress', 'result', 'error', 'attempts',
+        'cancel_requested', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    )
+    show_full_result_count = False
@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class ScaAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .archive import create_archive_table
+        from .db_routers import check_connections
+        from .search import SEARCH_FIELDS, create_search_indexes, invalidate_ngram_index
+
+        request_started.connect(check_connections, dispatch_uid='app.check_connections')
+        post_migrate.connect(create_search_indexes, sender=self)
+        post_migrate.connect(create_archive_table, sender=self)
+
+        for model in SEARCH_FIELDS:
+            post_save.connect(invalidate_ngram_index, sender=model)
+            post_delete.connect(invalidate_ngram_index, sender=model)
@@ -0,0 +1,90 @@
+from django.db import connections, router, transaction
+
+from .models import ArchivedSchedule, Schedule
+from .response_cache import bump_version
+
+
+def columns():
+    return [field.column for field in ArchivedSchedule._meta.local_fields]
+
+
+def partition_name(*keys):
+    return '_'.join([ArchivedSchedule._meta.db_table, *(str(int(key)) for key in keys)])
+
+
+def archive_table_exists(connection):
+    return ArchivedSchedule._meta.db_table in connection.introspection.table_names()
+
+
+def create_archive_table(using, **kwargs):
+    if not router.allow_migrate(using, ArchivedSchedule._meta.app_label, model_name='archivedschedule'):
+        return
+
+    connection = connections[using]
+    table = ArchivedSchedule._meta.db_table
+
+    if archive_table_exists(connection):
+        return
+
+    if connection.vendor != 'postgresql':
+        with connection.schema_editor() as editor:
+            editor.create_model(ArchivedSchedule)
+        return
+
+    quote = connection.ops.quote_name
+    definitions = [
+        f'{quote(field.column)} {field.db_type(connection)} NOT NULL'
+        for field in ArchivedSchedule._meta.local_fields
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote(table)} ('
+            f'{", ".join(definitions)}, PRIMARY KEY (syllabus_id, semester, id)'
+            f') PARTITION BY LIST (syllabus_id)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {quote(f"{table}_group_id")} ON {quote(table)} (group_id)')
+
+
+def create_partition(connection, syllabus_id, semester):
+    quote = connection.ops.quote_name
+    table = ArchivedSchedule._meta.db_table
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote(partition_name(syllabus_id))} '
+            f'PARTITION OF {quote(table)} FOR VALUES IN ({int(syllabus_id)}) PARTITION BY LIST (semester)'
+        )
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote(partition_name(syllabus_id, semester))} '
+            f'PARTITION OF {quote(partition_name(syllabus_id))} FOR VALUES IN ({int(semester)})'
+        )
+
+
+def archive_semester(syllabus_id, semester):
+    using = router.db_for_write(Schedule)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    column_list = ', '.join(quote(column) for column in columns())
+
+    create_archive_table(using)
+
+    with transaction.atomic(using=using):
+        if connection.vendor == 'postgresql':
+            create_partition(connection, syllabus_id, semester)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote(ArchivedSchedule._meta.db_table)} ({column_list}) '
+                f'SELECT {column_list} FROM {quote(Schedule._meta.db_table)} '
+                f'WHERE syllabus_id = %s AND semester = %s',
+                [syllabus_id, semester]
+            )
+            cursor.execute(
+                f'DELETE FROM {quote(Schedule._meta.db_table)} WHERE syllabus_id = %s AND semester = %s',
+                [syllabus_id, semester]
+            )
+            moved = cursor.rowcount
+
+    bump_version()
+    return moved
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    if settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+        return []
+
+    message = "The default cache is local to each process"
+    hint = (
+        "Response cache versions and read-your-writes pins must be seen by every web and "
+        "runworker process. Configure a shared CACHES backend: django_redis.cache.RedisCache "
+        "(django-redis) or django.core.cache.backends.db.DatabaseCache (run createcachetable)."
+    )
+    if settings.DEBUG:
+        return [Warning(message, hint=hint, id='app.W001')]
+    return [Error(message, hint=hint, id='app.E001')]
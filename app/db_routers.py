@@ -0,0 +1,66 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+READ_ACTIONS = ('list', 'retrieve')
+
+# The replica chosen for the current request, so all its queries see the same state
+_replica = ContextVar('replica', default=None)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def _pin_key(user):
+    return f'db-primary-pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    if user.is_authenticated:
+        cache.set(_pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    return user.is_authenticated and cache.get(_pin_key(user), False)
+
+
+def replica_in_use():
+    return _replica.get() is not None
+
+
+def use_replica(value=True):
+    _replica.set(random.choice(replicas()) if value and replicas() else None)
+
+
+@contextmanager
+def routing_context():
+    token = _replica.set(None)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def check_connections(**kwargs):
+    for conn in connections.all():
+        if conn.connection is not None and conn.settings_dict['CONN_MAX_AGE'] and not conn.is_usable():
+            conn.close()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replicas()
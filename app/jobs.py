@@ -0,0 +1,228 @@
+import inspect
+import logging
+import time
+import traceback
+from datetime import timedelta
+from multiprocessing import Process
+
+from django.core.management import call_command
+from django.db import DatabaseError, close_old_connections, connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job, Schedule
+from .response_cache import bump_version
+
+TASKS = {}
+
+# Seconds between heartbeats of a running job and after which a silent job is considered lost
+HEARTBEAT_INTERVAL = 5
+STALE_AFTER = 60
+# Longest pause of a worker while the database is unavailable
+MAX_BACKOFF = 60
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def task(name):
+    def register(func):
+        TASKS[name] = func
+        return func
+    return register
+
+
+def check_kwargs(name, kwargs):
+    if not isinstance(kwargs, dict):
+        raise TypeError("kwargs should be an object")
+    # Raises TypeError for missing or unexpected arguments, the first one is the job itself
+    inspect.signature(TASKS[name]).bind(None, **kwargs)
+
+
+def enqueue(name, max_attempts=1, **kwargs):
+    if name not in TASKS:
+        raise KeyError(f"Unknown task: {name}")
+    check_kwargs(name, kwargs)
+    return Job.objects.create(name=name, kwargs=kwargs, max_attempts=max_attempts)
+
+
+def stale_since():
+    return timezone.now() - timedelta(seconds=STALE_AFTER)
+
+
+def report_progress(job, percent):
+    Job.objects.filter(pk=job.pk).update(progress=min(max(int(percent), 0), 100))
+    if Job.objects.filter(pk=job.pk, cancel_requested=True).exists():
+        raise JobCancelled()
+
+
+def cancel(job):
+    if Job.objects.filter(pk=job.pk, status='pending').update(status='cancelled', finished_at=timezone.now()):
+        return True
+    return bool(Job.objects.filter(pk=job.pk, status='running').update(cancel_requested=True))
+
+
+def retry(job):
+    return bool(
+        Job.objects.filter(
+            Q(status__in=['failed', 'cancelled']) | Q(status='running', heartbeat_at__lt=stale_since()),
+            pk=job.pk,
+        ).update(
+            status='pending',
+            progress=0,
+            error='',
+            cancel_requested=False,
+            max_attempts=F('attempts') + 1,
+            started_at=None,
+            heartbeat_at=None,
+            finished_at=None,
+        )
+    )
+
+
+def release(job):
+    # The worker is shutting down, so the attempt is given back
+    Job.objects.filter(pk=job.pk, status='running').update(
+        status='pending',
+        attempts=F('attempts') - 1,
+        started_at=None,
+        heartbeat_at=None,
+    )
+
+
+def abandon(running, error):
+    now = timezone.now()
+    running.filter(cancel_requested=True).update(status='cancelled', error=error, finished_at=now)
+    running.filter(attempts__lt=F('max_attempts')).update(status='pending', error=error, heartbeat_at=None)
+    return running.update(status='failed', error=error, finished_at=now)
+
+
+def requeue_stale():
+    abandon(Job.objects.filter(status='running', heartbeat_at__lt=stale_since()), "Worker lost")
+
+
+def claim_next():
+    requeue_stale()
+    for pk in Job.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=pk, status='pending').update(
+            status='running',
+            attempts=F('attempts') + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    update_fields = ['status', 'error', 'finished_at']
+
+    try:
+        result = TASKS[job.name](job, **job.kwargs)
+    except JobCancelled:
+        job.status = 'cancelled'
+    except Exception:
+        job.error = traceback.format_exc()
+        job.status = 'pending' if job.attempts < job.max_attempts else 'failed'
+    except BaseException:
+        release(job)
+        raise
+    else:
+        job.status = 'done'
+        job.progress = 100
+        job.result = result
+        update_fields += ['progress', 'result']
+
+    if job.status != 'pending':
+        job.finished_at = timezone.now()
+    job.save(update_fields=update_fields)
+    bump_version()
+
+
+def supervise(job, target):
+    # The job runs in a child process, so it can be stopped on cancel even without progress reports
+    connections.close_all()
+    process = Process(target=target, args=(job.pk,), daemon=True)
+    process.start()
+
+    running = Job.objects.filter(pk=job.pk, status='running')
+    try:
+        while True:
+            process.join(HEARTBEAT_INTERVAL)
+            if not process.is_alive():
+                break
+            try:
+                running.update(heartbeat_at=timezone.now())
+                cancelled = running.filter(cancel_requested=True).exists()
+            except DatabaseError:
+                # The job keeps running, other workers requeue it if the database stays unavailable
+                logger.warning("Cannot record the heartbeat of job #%s", job.pk, exc_info=True)
+                close_old_connections()
+                continue
+            if cancelled:
+                process.terminate()
+                process.join()
+                running.update(status='cancelled', finished_at=timezone.now())
+                break
+    except BaseException:
+        process.terminate()
+        process.join()
+        try:
+            release(job)
+        except DatabaseError:
+            logger.warning("Cannot release job #%s, it is requeued once stale", job.pk, exc_info=True)
+        raise
+
+    if process.exitcode:
+        abandon(running, f"Job process exited with code {process.exitcode}")
+    bump_version()
+
+
+def work(poll_interval=1.0, stop_when_idle=False, target=None):
+    backoff = max(poll_interval, 1)
+    while True:
+        # Workers never see request_started, so broken and expired connections are dropped here
+        close_old_connections()
+        try:
+            job = claim_next()
+            if job and target:
+                supervise(job, target)
+            elif job:
+                run_job(job)
+        except DatabaseError:
+            logger.exception("Job queue database error, retrying in %.0f s", backoff)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+            continue
+
+        backoff = max(poll_interval, 1)
+        if job:
+            continue
+        if stop_when_idle:
+            return
+        time.sleep(poll_interval)
+
+
+@task('generatedata')
+def generatedata(job):
+    from .management.commands.generatedata import generate_all
+
+    generate_all(progress=lambda percent: report_progress(job, percent))
+    return {'schedule': Schedule.objects.count()}
+
+
+@task('archivesemester')
+def archivesemester(job, syllabus, semester):
+    from .archive import archive_semester
+
+    return {'archived': archive_semester(syllabus, semester)}
+
+
+@task('wipedata')
+def wipedata(job):
+    call_command('wipedata')
@@ -0,0 +1,19 @@
+from django.core.management import BaseCommand, CommandError
+
+from app.archive import archive_semester
+
+
+class Command(BaseCommand):
+    help = 'Move a semester of a syllabus from the schedule into the archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('syllabus', type=int)
+        parser.add_argument('semester', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            moved = archive_semester(options['syllabus'], options['semester'])
+        except Exception as e:
+            raise CommandError(str(e)) from e
+
+        print(f"Archived {moved} schedule entries")
@@ -2,11 +2,12 @@ import random
 
 import faker.providers
 from django.core.management import call_command
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.db import IntegrityError
 from faker import Faker
 from ..lists import DISCIPLINES, CLASSROOM_TYPES
 from ...models import *
+from ...response_cache import bump_version
 
 
 class Provider(faker.providers.BaseProvider):
@@ -153,23 +154,35 @@ def generate_schedule():
                             continue
 
 
+def generate_all(progress=None):
+    call_command('wipedata')
+
+    fake = Faker('ru_RU')
+    fake.add_provider(Provider)
+
+    steps = [
+        generate_directions,
+        generate_syllabuses,
+        lambda: generate_disciplines(fake),
+        lambda: generate_lecturers(fake),
+        lambda: generate_groups(fake),
+        lambda: generate_classrooms(fake),
+        generate_schedule,
+    ]
+
+    for number, step in enumerate(steps, start=1):
+        step()
+        if progress:
+            progress(int(number * 100 / len(steps)))
+
+
 class Command(BaseCommand):
     help = "Test data generation"
 
     def handle(self, *args, **options):
         try:
-            call_command('wipedata')
-
-            fake = Faker('ru_RU')
-            fake.add_provider(Provider)
-
-            generate_directions()
-            generate_syllabuses()
-            generate_disciplines(fake)
-            generate_lecturers(fake)
-            generate_groups(fake)
-            generate_classrooms(fake)
-            generate_schedule()
-
+            generate_all()
         except Exception as e:
-            print(str(e))
+            raise CommandError(str(e)) from e
+        finally:
+            bump_version()
@@ -0,0 +1,289 @@
+import asyncio
+import json
+import random
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import aiohttp
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import BaseCommand, CommandError, call_command
+
+JSON_API = 'application/vnd.api+json'
+
+DISPATCHER = 'loadtest-dispatcher'
+
+REFERENCE_PATHS = (
+    '/api/lecturers/',
+    '/api/disciplines/',
+    '/api/groups/',
+    '/api/classrooms/',
+    '/api/syllabuses/',
+)
+
+
+def student(number):
+    return f'loadtest-student-{number}'
+
+
+def port_is_free(port):
+    with socket.socket() as sock:
+        try:
+            sock.bind(('127.0.0.1', port))
+        except OSError:
+            return False
+    return True
+
+
+def percentile(values, p):
+    if not values:
+        return 0
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+class Stats:
+    def __init__(self):
+        self.interval = []
+        self.interval_errors = 0
+        self.endpoints = defaultdict(list)
+        self.endpoint_errors = defaultdict(int)
+
+    def record(self, name, latency, ok):
+        self.interval.append(latency)
+        self.endpoints[name].append(latency)
+        if not ok:
+            self.interval_errors += 1
+            self.endpoint_errors[name] += 1
+
+    def flush(self):
+        latencies, errors = sorted(self.interval), self.interval_errors
+        self.interval, self.interval_errors = [], 0
+        return latencies, errors
+
+
+class Scenario:
+    def __init__(self, session, url, stats, username, password, think, schedule=None, group=None):
+        self.session = session
+        self.url = url
+        self.stats = stats
+        self.username = username
+        self.password = password
+        self.think = think
+        self.schedule = schedule
+        self.group = group
+
+    async def request(self, name, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            async with self.session.request(method, self.url + path, **kwargs) as response:
+                body = await response.read()
+                ok = response.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            body, ok = None, False
+        self.stats.record(name, (time.perf_counter() - started) * 1000, ok)
+        return body if ok else None
+
+    async def login(self):
+        body = await self.request(
+            'login', 'POST', '/auth/token/login/',
+            data={'username': self.username, 'password': self.password}
+        )
+        if body is None:
+            return None
+        token = json.loads(body)['data']['attributes']['auth_token']
+        return {'Authorization': f"Token {token}"}
+
+    async def load_schedule(self):
+        headers = await self.login()
+        if headers is None:
+            raise CommandError(f"Token login failed for {self.username}, check the accounts and --password")
+        body = await self.request('schedule (columnar)', 'GET', '/api/schedule/?format=columnar', headers=headers)
+        return json.loads(body)['columns'] if body else {'id': [], 'group': [], 'type': [], 'classroom': []}
+
+    async def timetable(self, headers):
+        path = '/api/schedule/' if self.group is None else f'/api/schedule/?group={self.group}'
+        await self.request('schedule (group)', 'GET', path, headers={**headers, 'Accept': JSON_API})
+
+    async def reference(self, headers):
+        path = random.choice(REFERENCE_PATHS)
+        await self.request(path, 'GET', path, headers={**headers, 'Accept': JSON_API})
+
+    async def search(self, headers):
+        query = random.choice(['ив', 'про', 'мат', '1', 'А'])
+        await self.request('search', 'GET', f'/api/search/?q={query}', headers=headers)
+
+    async def dispatcher_write(self, headers):
+        if not self.schedule['id']:
+            return
+        row = random.randrange(len(self.schedule['id']))
+        pk = self.schedule['id'][row]
+        # Schedule.type clashes with the JSON:API resource type, so it is sent as an attribute too
+        document = {'data': {
+            'type': 'Schedule',
+            'id': str(pk),
+            'attributes': {
+                'type': self.schedule['type'][row],
+                'classroom': random.choice(self.schedule['classroom']),
+            },
+        }}
+        await self.request(
+            'schedule write', 'PATCH', f'/api/schedule/{pk}/',
+            data=json.dumps(document),
+            headers={**headers, 'Accept': JSON_API, 'Content-Type': JSON_API}
+        )
+
+    async def run(self, deadline):
+        headers = await self.login()
+        if headers is None:
+            return
+
+        # A write pins its user to the primary, so only the dispatcher account writes
+        if self.username == DISPATCHER:
+            actions, weights = [self.dispatcher_write], [1]
+        else:
+            actions, weights = [self.timetable, self.reference, self.search], [72, 22, 6]
+
+        while time.monotonic() < deadline:
+            await random.choices(actions, weights)[0](headers)
+            await asyncio.sleep(random.expovariate(1 / self.think))
+
+
+class Command(BaseCommand):
+    help = 'Simulate the timetable rush against a local server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help='Use a running server instead of starting one')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--seed', action='store_true', help='Run generatedata first')
+        parser.add_argument('--clients', type=int, default=200, help='Student clients')
+        parser.add_argument('--dispatchers', type=int, default=2, help='Dispatcher clients')
+        parser.add_argument('--students', type=int, default=50, help='Student accounts shared by the clients')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds')
+        parser.add_argument('--ramp-up', type=float, default=10, help='Seconds')
+        parser.add_argument('--think', type=float, default=1.0, help='Mean pause between requests, seconds')
+        parser.add_argument('--interval', type=float, default=5, help='Report interval, seconds')
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help=f'Create {DISPATCHER} and loadtest-student-<n> for the run and delete them afterwards '
+                 f'(only with the server started by the command)'
+        )
+        parser.add_argument('--password', help='Password of the load test accounts, random with --create-users')
+
+    def handle(self, *args, **options):
+        if options['create_users']:
+            if options['url']:
+                raise CommandError("--create-users only works with the server started by the command")
+            options['password'] = options['password'] or secrets.token_urlsafe()
+        elif not options['password']:
+            raise CommandError("Pass --password of existing load test accounts or --create-users")
+
+        if not options['url'] and not port_is_free(options['port']):
+            raise CommandError(f"Port {options['port']} is in use, pass another --port or --url")
+
+        if options['seed']:
+            call_command('generatedata')
+
+        usernames = [DISPATCHER] + [student(number) for number in range(1, options['students'] + 1)]
+        if options['create_users']:
+            self.create_users(usernames, options['password'])
+
+        server = None
+        url = options['url']
+        if not url:
+            url = f"http://127.0.0.1:{options['port']}"
+            server = subprocess.Popen(
+                [sys.executable, 'manage.py', 'runserver', '--noreload', f"127.0.0.1:{options['port']}"],
+                cwd=settings.BASE_DIR,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+        try:
+            asyncio.run(self.load(url.rstrip('/'), options, server))
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+            if options['create_users']:
+                User.objects.filter(username__in=usernames).delete()
+
+    def create_users(self, usernames, password):
+        # The API only admits staff users
+        password = make_password(password)
+        User.objects.filter(username__in=usernames).delete()
+        User.objects.bulk_create([User(username=username, password=password, is_staff=True) for username in usernames])
+
+    async def wait_for_server(self, session, url, server):
+        for _ in range(100):
+            # runserver output is discarded, so a server that failed to start shows only here
+            if server and server.poll() is not None:
+                raise CommandError(f"Server at {url} exited with code {server.returncode}")
+            try:
+                async with session.get(url + '/api/'):
+                    return
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.2)
+        raise CommandError(f"Server at {url} did not start")
+
+    async def report(self, stats, interval, started):
+        print(f"{'time':>6} {'rps':>8} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        while True:
+            await asyncio.sleep(interval)
+            latencies, errors = stats.flush()
+            print(
+                f"{time.monotonic() - started:6.0f} {len(latencies) / interval:8.1f} {errors:7d} "
+                f"{percentile(latencies, 50):8.1f} {percentile(latencies, 95):8.1f} "
+                f"{percentile(latencies, 99):8.1f} {percentile(latencies, 100):8.1f}"
+            )
+
+    async def client(self, scenario, delay, deadline):
+        await asyncio.sleep(delay)
+        await scenario.run(deadline)
+
+    async def load(self, url, options, server=None):
+        stats = Stats()
+        connector = aiohttp.TCPConnector(limit=options['clients'] + options['dispatchers'])
+        timeout = aiohttp.ClientTimeout(total=60)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await self.wait_for_server(session, url, server)
+
+            schedule = await Scenario(session, url, stats, DISPATCHER, options['password'], options['think']).load_schedule()
+            stats.flush()
+
+            started = time.monotonic()
+            deadline = started + options['duration']
+            reporter = asyncio.create_task(self.report(stats, options['interval'], started))
+
+            usernames = [DISPATCHER] * options['dispatchers'] + [
+                student(number % options['students'] + 1) for number in range(options['clients'])
+            ]
+            random.shuffle(usernames)
+            # Each student follows the timetable of one group
+            groups = sorted(set(schedule['group'])) or [None]
+            scenarios = [
+                Scenario(
+                    session, url, stats, username, options['password'], options['think'], schedule, random.choice(groups)
+                )
+                for username in usernames
+            ]
+            try:
+                await asyncio.gather(*(
+                    self.client(scenario, options['ramp_up'] * number / len(scenarios), deadline)
+                    for number, scenario in enumerate(scenarios)
+                ))
+            finally:
+                reporter.cancel()
+
+        print(f"\n{'endpoint':<24} {'requests':>9} {'errors':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, latencies in sorted(stats.endpoints.items()):
+            latencies.sort()
+            print(
+                f"{name:<24} {len(latencies):9d} {stats.endpoint_errors[name]:7d} "
+                f"{percentile(latencies, 50):8.1f} {percentile(latencies, 95):8.1f} {percentile(latencies, 99):8.1f}"
+            )
@@ -0,0 +1,73 @@
+import signal
+import sys
+import time
+from multiprocessing import Process
+from multiprocessing.connection import wait
+
+import django
+from django.core.management import BaseCommand
+from django.db import connections
+
+
+def stop(signum, frame):
+    # Lets the worker put its running job back in the queue on terminate()
+    sys.exit(0)
+
+
+def execute(pk):
+    # A forked job process must die on terminate(), the worker marks the job itself
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    django.setup()
+    from app.jobs import run_job
+    from app.models import Job
+
+    try:
+        run_job(Job.objects.get(pk=pk))
+    except KeyboardInterrupt:
+        pass
+
+
+def worker(poll_interval):
+    django.setup()
+    from app.jobs import work
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        work(poll_interval, target=execute)
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--poll', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        connections.close_all()
+
+        processes = [self.start_worker(options['poll']) for _ in range(options['processes'])]
+
+        print(f"Started {len(processes)} worker(s), press Ctrl+C to stop")
+
+        try:
+            while True:
+                wait([process.sentinel for process in processes])
+                for number, process in enumerate(processes):
+                    if process.exitcode is not None:
+                        print(f"Worker {process.pid} exited with code {process.exitcode}, restarting")
+                        time.sleep(1)
+                        processes[number] = self.start_worker(options['poll'])
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
+
+    def start_worker(self, poll_interval):
+        # Not daemonic: each worker starts a child process per job
+        process = Process(target=worker, args=(poll_interval,))
+        process.start()
+        return process
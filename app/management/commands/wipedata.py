@@ -1,6 +1,9 @@
-from django.core.management import BaseCommand
+from django.core.management import BaseCommand, CommandError
+from django.db import connections, router
 
-from app.models import Direction, Classroom, Lecturer
+from app.archive import archive_table_exists
+from app.models import ArchivedSchedule, Direction, Classroom, Lecturer
+from app.response_cache import bump_version
 
 
 class Command(BaseCommand):
@@ -10,5 +13,10 @@ class Command(BaseCommand):
         try:
             for model in [Direction, Classroom, Lecturer]:
                 model.objects.all().delete()
+
+            if archive_table_exists(connections[router.db_for_write(ArchivedSchedule)]):
+                ArchivedSchedule.objects.all().delete()
         except Exception as e:
-            print(str(e))
+            raise CommandError(str(e)) from e
+        finally:
+            bump_version()
@@ -209,7 +209,7 @@ class Schedule(Model):
     type = SmallIntegerField(choices=LECTURE_TYPE, verbose_name="Тип занятия")
 
     def __str__(self):
-        return f"Уч. план: {self.syllabus.pk}, " \
+        return f"Уч. план: {self.syllabus_id}, " \
                f"Семестр: {self.semester}, " \
                f"Группа: {self.group}, " \
                f"Чёт. неделя: {self.even_week}, " \
@@ -219,3 +219,80 @@ class Schedule(Model):
     class Meta:
         verbose_name = "Расписание"
         verbose_name_plural = "Расписание"
+        indexes = [Index(fields=['syllabus', 'semester', 'group'])]
+
+
+class ArchivedSchedule(Model):
+    id = BigIntegerField(primary_key=True)
+    syllabus = ForeignKey(
+        Syllabus, on_delete=DO_NOTHING, db_constraint=False, related_name='+', verbose_name="Учебный план"
+    )
+    semester = SmallIntegerField(verbose_name="Семестр")
+
+    group = ForeignKey(Group, on_delete=DO_NOTHING, db_constraint=False, related_name='+', verbose_name="Группа")
+    even_week = BooleanField(verbose_name="Чётная неделя")
+    week_day = SmallIntegerField(choices=DAYS_OF_WEEK, verbose_name="День недели")
+    period = SmallIntegerField(verbose_name="Пара")
+
+    discipline = ForeignKey(
+        Discipline, on_delete=DO_NOTHING, db_constraint=False, related_name='+', verbose_name="Дисциплина"
+    )
+    lecturer = ForeignKey(
+        Lecturer, on_delete=DO_NOTHING, db_constraint=False, related_name='+', verbose_name="Преподаватель"
+    )
+    classroom = ForeignKey(
+        Classroom, on_delete=DO_NOTHING, db_constraint=False, related_name='+', verbose_name="Аудитория"
+    )
+
+    type = SmallIntegerField(choices=LECTURE_TYPE, verbose_name="Тип занятия")
+
+    def __str__(self):
+        return f"Уч. план: {self.syllabus_id}, " \
+               f"Семестр: {self.semester}, " \
+               f"Группа: {self.group_id}, " \
+               f"Чёт. неделя: {self.even_week}, " \
+               f"День: {self.week_day}, " \
+               f"Пара: {self.period}"
+
+    class Meta:
+        # Created by app.archive after migrate, partitioned by syllabus and semester on PostgreSQL
+        managed = False
+        db_table = 'app_archivedschedule'
+        verbose_name = "Архив расписания"
+        verbose_name_plural = "Архив расписания"
+        indexes = [Index(fields=['syllabus', 'semester'])]
+
+
+JOB_STATUS = (
+    ('pending', 'В очереди'),
+    ('running', 'Выполняется'),
+    ('done', 'Завершено'),
+    ('failed', 'Ошибка'),
+    ('cancelled', 'Отменено'),
+)
+
+
+class Job(Model):
+    name = CharField(max_length=100, verbose_name="Задача")
+    kwargs = JSONField(default=dict, blank=True, verbose_name="Параметры")
+    status = CharField(max_length=10, choices=JOB_STATUS, default='pending', verbose_name="Статус")
+    progress = SmallIntegerField(default=0, verbose_name="Прогресс, %")
+    result = JSONField(null=True, blank=True, verbose_name="Результат")
+    error = TextField(blank=True, default='', verbose_name="Ошибка")
+
+    attempts = SmallIntegerField(default=0, verbose_name="Попыток")
+    max_attempts = SmallIntegerField(default=1, verbose_name="Максимум попыток", validators=[gt_zero])
+    cancel_requested = BooleanField(default=False, verbose_name="Запрошена отмена")
+
+    created_at = DateTimeField(auto_now_add=True, verbose_name="Создана")
+    started_at = DateTimeField(null=True, blank=True, verbose_name="Начата")
+    heartbeat_at = DateTimeField(null=True, blank=True, verbose_name="Последний отклик")
+    finished_at = DateTimeField(null=True, blank=True, verbose_name="Завершена")
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        indexes = [Index(fields=['status', 'id'])]
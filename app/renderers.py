@@ -0,0 +1,19 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.columnar+json'
+    format = 'columnar'
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True)
@@ -0,0 +1,99 @@
+import gzip
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+VERSION_KEY = 'response-cache-version'
+
+ENCODERS = {
+    'identity': lambda body: body,
+    'gzip': lambda body: gzip.compress(body, compresslevel=9),
+}
+if brotli:
+    ENCODERS['br'] = lambda body: brotli.compress(body, quality=9)
+if zstandard:
+    ENCODERS['zstd'] = lambda body: zstandard.ZstdCompressor(level=10).compress(body)
+
+PREFERENCE = ('br', 'zstd', 'gzip', 'identity')
+
+
+def data_version():
+    # The version is the time of the last data change, so it also tells how fresh the data is
+    # A lost version restarts from the current time, so older stored responses never match again
+    return cache.get_or_set(VERSION_KEY, time.time, None)
+
+
+def bump_version():
+    cache.set(VERSION_KEY, time.time(), None)
+
+
+def negotiate(accept_encoding):
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0
+        qualities[coding.lower()] = quality
+
+    def quality(coding):
+        # identity is acceptable unless excluded, but any coding the client names is preferred to it
+        return qualities.get(coding, qualities.get('*', 0.001 if coding == 'identity' else 0))
+
+    # The highest client quality wins, ties go to the better compression
+    best = max((coding for coding in PREFERENCE if coding in ENCODERS), key=quality)
+    return best if quality(best) > 0 else 'identity'
+
+
+def cache_key(request, media_type, encoding, version):
+    raw = f'{version}:{media_type}:{encoding}:{request.get_full_path()}'
+    return 'response:' + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def build_response(headers, body, encoding, status):
+    response = HttpResponse(body)
+    for header, value in headers:
+        response[header] = value
+    if encoding != 'identity':
+        response['Content-Encoding'] = encoding
+    response['X-Cache'] = status
+    patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+    return response
+
+
+def get(request, media_type, encoding, version):
+    cached = cache.get(cache_key(request, media_type, encoding, version))
+    if cached is None:
+        return None
+    return build_response(*cached, encoding, 'HIT')
+
+
+def store(request, media_type, version, response):
+    headers = [
+        (header, value) for header, value in response.items()
+        if header.lower() not in ('content-length', 'content-encoding')
+    ]
+    variants = {encoding: (headers, encode(response.content)) for encoding, encode in ENCODERS.items()}
+    cache.set_many(
+        {cache_key(request, media_type, encoding, version): variant for encoding, variant in variants.items()},
+        settings.RESPONSE_CACHE_TIMEOUT
+    )
+    return variants
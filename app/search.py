@@ -0,0 +1,178 @@
+import logging
+import re
+import time
+from collections import defaultdict
+
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import DatabaseError, connections, router, transaction
+from django.db.models import Q
+from django.db.models.functions import Greatest, Upper
+
+from .models import Classroom, Discipline, Group, Lecturer
+
+SEARCH_FIELDS = {
+    Lecturer: ('surname', 'first_name', 'patronymic'),
+    Discipline: ('name', 'code'),
+    Group: ('number',),
+    Classroom: ('number',),
+}
+
+SIMILARITY_THRESHOLD = 0.3
+
+# In-memory indexes are also rebuilt periodically to pick up changes made by other processes
+NGRAM_INDEX_TTL = 30
+
+WORD_RE = re.compile(r'\w+')
+
+logger = logging.getLogger(__name__)
+
+
+def terms(query):
+    return WORD_RE.findall(query.casefold())
+
+
+def label(values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def search(query, limit=20):
+    query_terms = terms(query)
+    if not query_terms:
+        return []
+
+    results = []
+    for model, fields in SEARCH_FIELDS.items():
+        connection = connections[router.db_for_read(model)]
+        if connection.vendor == 'postgresql' and has_trigram(connection):
+            results += postgres_search(model, fields, query_terms, limit)
+        else:
+            results += ngram_index(model).search(query_terms, limit)
+
+    results.sort(key=lambda result: -result[3])
+    return results[:limit]
+
+
+def postgres_search(model, fields, query_terms, limit):
+    queryset = model.objects.annotate(**{f'{field}_upper': Upper(field) for field in fields})
+    score = None
+
+    for term in query_terms:
+        term = term.upper()
+        match = Q()
+        for field in fields:
+            match |= Q(**{f'{field}_upper__startswith': term}) | Q(**{f'{field}_upper__trigram_similar': term})
+        queryset = queryset.filter(match)
+
+        similarities = [TrigramSimilarity(f'{field}_upper', term) for field in fields]
+        term_similarity = Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        score = term_similarity if score is None else score + term_similarity
+
+    rows = queryset.annotate(score=score).order_by('-score').values_list('pk', *fields, 'score')[:limit]
+    return [(model, pk, label(values), score) for pk, *values, score in rows]
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(term, word):
+    if word.startswith(term):
+        return 1.0
+    term_trigrams, word_trigrams = trigrams(term), trigrams(word)
+    return len(term_trigrams & word_trigrams) / len(term_trigrams | word_trigrams)
+
+
+class NgramIndex:
+    def __init__(self, model, fields):
+        self.model = model
+        self.built_at = time.monotonic()
+        self.entries = []
+        self.postings = defaultdict(set)
+
+        for pk, *values in model.objects.values_list('pk', *fields):
+            entry_label = label(values)
+            words = terms(entry_label)
+            for word in words:
+                for trigram in trigrams(word):
+                    self.postings[trigram].add(len(self.entries))
+            self.entries.append((pk, entry_label, words))
+
+    def candidates(self, term):
+        found = set()
+        for trigram in trigrams(term):
+            found |= self.postings.get(trigram, set())
+        return found
+
+    def search(self, query_terms, limit):
+        candidates = set.intersection(*(self.candidates(term) for term in query_terms))
+
+        results = []
+        for entry in candidates:
+            pk, entry_label, words = self.entries[entry]
+            scores = [max(similarity(term, word) for word in words) for term in query_terms]
+            if min(scores) >= SIMILARITY_THRESHOLD:
+                results.append((self.model, pk, entry_label, sum(scores)))
+
+        results.sort(key=lambda result: -result[3])
+        return results[:limit]
+
+
+_ngram_indexes = {}
+
+
+def ngram_index(model):
+    index = _ngram_indexes.get(model)
+    if index is None or time.monotonic() - index.built_at > NGRAM_INDEX_TTL:
+        index = _ngram_indexes[model] = NgramIndex(model, SEARCH_FIELDS[model])
+    return index
+
+
+def invalidate_ngram_index(sender, **kwargs):
+    _ngram_indexes.pop(sender, None)
+
+
+_trigram_support = {}
+
+
+def has_trigram(connection):
+    if connection.alias not in _trigram_support:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_support[connection.alias] = cursor.fetchone() is not None
+    return _trigram_support[connection.alias]
+
+
+def create_search_indexes(using, **kwargs):
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return
+
+    if not has_trigram(connection):
+        try:
+            with transaction.atomic(using=using), connection.cursor() as cursor:
+                cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except DatabaseError as error:
+            # Only a superuser (or the database owner for trusted extensions) may create it
+            logger.warning(
+                "pg_trgm is not installed and could not be created (%s). "
+                "Search uses in-memory indexes until a superuser runs CREATE EXTENSION pg_trgm "
+                "and migrate is run again.",
+                error,
+            )
+            return
+        _trigram_support[using] = True
+
+    quote = connection.ops.quote_name
+
+    with connection.cursor() as cursor:
+        for model, fields in SEARCH_FIELDS.items():
+            if not router.allow_migrate_model(using, model):
+                continue
+            table = model._meta.db_table
+            for field in fields:
+                column = model._meta.get_field(field).column
+                cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS {quote(f"{table}_{column}_trgm")} '
+                    f'ON {quote(table)} USING gin (UPPER({quote(column)}) gin_trgm_ops)'
+                )
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from .jobs import TASKS, check_kwargs
 from .models import *
 
 
@@ -43,3 +44,31 @@ class SchedulesSerializer(serializers.ModelSerializer):
     class Meta:
         model = Schedule
         fields = '__all__'
+
+
+class ArchivedSchedulesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedSchedule
+        fields = '__all__'
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = '__all__'
+        read_only_fields = [
+            'status', 'progress', 'result', 'error', 'attempts',
+            'cancel_requested', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+        ]
+
+    def validate_name(self, value):
+        if value not in TASKS:
+            raise serializers.ValidationError(f"Unknown task: {value}")
+        return value
+
+    def validate(self, attrs):
+        try:
+            check_kwargs(attrs['name'], attrs.get('kwargs', {}))
+        except TypeError as error:
+            raise serializers.ValidationError({'kwargs': str(error)})
+        return attrs
@@ -1,3 +1,324 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connections
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import msgpack
+from rest_framework.test import APIClient
+
+from . import archive, db_routers, jobs, response_cache, search
+from .apps import ScaAppConfig
+from .db_routers import PrimaryReplicaRouter
+from .models import *
+from .views import ScheduleViewSet
+
+
+def create_schedule():
+    direction = Direction.objects.create(code='09.03.01', name='Информатика')
+    syllabus = Syllabus.objects.create(year='2020-2024', specialty_code='09.03.01', specialty_name='ИВТ', direction=direction)
+    group = Group.objects.create(number='ИВТ-1', students_count=25, syllabus=syllabus)
+    discipline = Discipline.objects.create(name='Математика', code='Б1.1', syllabus=syllabus, cycle='Б1', hours_total=144)
+    lecturer = Lecturer.objects.create(first_name='Иван', surname='Иванов')
+    classroom = Classroom.objects.create(number='101', seats_count=30)
+
+    schedule = {
+        semester: [
+            Schedule.objects.create(
+                syllabus=syllabus, semester=semester, group=group, even_week=False, week_day=week_day,
+                period=1, discipline=discipline, lecturer=lecturer, classroom=classroom, type=1,
+            ).pk
+            for week_day in (1, 2)
+        ]
+        for semester in (1, 2)
+    }
+    return syllabus, lecturer, schedule
+
+
+class AppConfigTests(TestCase):
+    def test_custom_app_config_is_installed(self):
+        self.assertIsInstance(apps.get_app_config('app'), ScaAppConfig)
+
+
+class ReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.lecturer = Lecturer.objects.create(first_name='Иван', surname='Иванов')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, url, **kwargs):
+        with CaptureQueriesContext(connections['default']) as default, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(url, **kwargs)
+        return response, len(default), len(replica)
+
+    def test_reads_go_to_replica(self):
+        response, default, replica = self.request('get', '/api/lecturers/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(default, 0)
+        self.assertGreater(replica, 0)
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        document = {'data': {'type': 'Lecturer', 'id': str(self.lecturer.pk), 'attributes': {'first_name': 'Пётр'}}}
+        response, default, replica = self.request(
+            'patch', f'/api/lecturers/{self.lecturer.pk}/',
+            data=json.dumps(document), content_type='application/vnd.api+json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(default, 0)
+        self.assertEqual(replica, 0)
+
+        response, default, replica = self.request('get', f'/api/lecturers/{self.lecturer.pk}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(default, 0)
+        self.assertEqual(replica, 0)
+
+    @override_settings(DATABASE_REPLICAS=['replica', 'replica2'])
+    def test_one_replica_per_request(self):
+        router = PrimaryReplicaRouter()
+
+        with db_routers.routing_context():
+            db_routers.use_replica()
+            aliases = {router.db_for_read(Schedule) for _ in range(50)}
+
+        self.assertEqual(len(aliases), 1)
+
+    def test_replicas_are_not_migrated(self):
+        router = PrimaryReplicaRouter()
+
+        self.assertTrue(router.allow_migrate('default', 'app'))
+        self.assertFalse(router.allow_migrate('replica', 'app'))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.lecturer = Lecturer.objects.create(first_name='Иван', surname='Иванов')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_write_request_invalidates_cached_responses(self):
+        self.assertEqual(self.client.get('/api/lecturers/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/lecturers/')['X-Cache'], 'HIT')
+
+        document = {'data': {'type': 'Lecturer', 'id': str(self.lecturer.pk), 'attributes': {'first_name': 'Пётр'}}}
+        self.client.patch(
+            f'/api/lecturers/{self.lecturer.pk}/',
+            data=json.dumps(document), content_type='application/vnd.api+json'
+        )
+
+        response = self.client.get('/api/lecturers/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Пётр', response.content.decode())
+
+    def test_lost_version_does_not_revive_old_responses(self):
+        self.assertEqual(self.client.get('/api/lecturers/')['X-Cache'], 'MISS')
+        cache.delete(response_cache.VERSION_KEY)
+
+        self.assertEqual(self.client.get('/api/lecturers/')['X-Cache'], 'MISS')
+
+    def test_cached_response_keeps_headers(self):
+        allow = self.client.get('/api/lecturers/')['Allow']
+        response = self.client.get('/api/lecturers/')
+
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response['Allow'], allow)
+
+    def test_encoding_follows_client_quality(self):
+        self.assertEqual(response_cache.negotiate('gzip, br;q=0.1'), 'gzip')
+        self.assertEqual(response_cache.negotiate('gzip;q=0.5, identity'), 'identity')
+        self.assertEqual(response_cache.negotiate('gzip;q=0.5'), 'gzip')
+
+    def test_schedule_deletes_keep_fast_path(self):
+        self.assertFalse(post_delete.has_listeners(Schedule))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class JobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def test_kwargs_are_checked_against_the_task(self):
+        document = {'data': {'type': 'Job', 'attributes': {'name': 'archivesemester'}}}
+        response = self.client.post('/api/jobs/', data=json.dumps(document), content_type='application/vnd.api+json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Job.objects.exists())
+
+    def test_stale_running_job_is_requeued(self):
+        stale = timezone.now() - timedelta(seconds=jobs.STALE_AFTER + 1)
+        job = Job.objects.create(name='wipedata', status='running', attempts=1, max_attempts=2, heartbeat_at=stale)
+
+        self.assertEqual(jobs.claim_next().pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), ('running', 2, "Worker lost"))
+
+    def test_worker_survives_database_errors(self):
+        job = jobs.enqueue('wipedata')
+        claim_next = mock.Mock(side_effect=[OperationalError('database is locked'), job, None])
+        Job.objects.filter(pk=job.pk).update(status='running', attempts=1)
+
+        # Closing connections would end the test transaction, as the test client avoids too
+        with mock.patch.object(jobs, 'claim_next', claim_next), mock.patch.object(jobs.time, 'sleep') as sleep, \
+                mock.patch.object(jobs, 'close_old_connections'), self.assertLogs('app.jobs', 'ERROR'):
+            jobs.work(stop_when_idle=True)
+
+        sleep.assert_called_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+
+    def test_interrupted_job_goes_back_to_queue(self):
+        job = jobs.enqueue('wipedata')
+        job = jobs.claim_next()
+
+        with mock.patch.dict(jobs.TASKS, wipedata=mock.Mock(side_effect=KeyboardInterrupt)):
+            with self.assertRaises(KeyboardInterrupt):
+                jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('pending', 0))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+        # Indexes built in other tests may hold rows their rolled back transactions removed
+        search._ngram_indexes.clear()
+        Lecturer.objects.create(first_name='Иван', surname='Иванов')
+        Lecturer.objects.create(first_name='Иван', surname='Петров')
+
+    def labels(self, query):
+        return [label for model, pk, label, score in search.search(query)]
+
+    def test_prefix_match_ignores_case(self):
+        self.assertCountEqual(self.labels('иван'), ['Иванов Иван', 'Петров Иван'])
+        self.assertEqual(self.labels('ИВАНОВ')[0], 'Иванов Иван')
+
+    def test_typo_still_matches(self):
+        self.assertEqual(self.labels('ивнов')[0], 'Иванов Иван')
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.labels('сидоров'), [])
+
+        lecturer = Lecturer.objects.create(first_name='Пётр', surname='Сидоров')
+        self.assertEqual(self.labels('сидоров'), ['Сидоров Пётр'])
+
+        lecturer.delete()
+        self.assertEqual(self.labels('сидоров'), [])
+
+    def test_limit_is_at_least_one(self):
+        response = self.client.get('/api/search/', {'q': 'иван', 'limit': -1})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['data']), 1)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ScheduleFilterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def test_group_must_be_an_integer(self):
+        self.assertEqual(self.client.get('/api/schedule/', {'group': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/schedule/', {'group': '1'}).status_code, 200)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ScheduleAdminTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def test_changelist_filters_do_not_scan_tables(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get('/admin/app/schedule/', {'semester': '1', 'group_number': 'ИВТ-1'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'name="group_number" value="ИВТ-1"')
+        for query in queries:
+            self.assertNotIn('DISTINCT', query['sql'])
+            self.assertFalse(query['sql'].startswith('SELECT "app_group"'))
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ArchiveTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_superuser('admin', 'admin@example.com', 'admin')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        self.syllabus, self.lecturer, self.schedule = create_schedule()
+
+    def ids(self, url):
+        return sorted(int(item['id']) for item in self.client.get(url).json()['data'])
+
+    def test_archive_semester_moves_rows(self):
+        self.assertEqual(archive.archive_semester(self.syllabus.pk, 1), 2)
+
+        self.assertEqual(self.ids('/api/schedule/'), self.schedule[2])
+        self.assertEqual(self.ids('/api/schedule-archive/?semester=1'), self.schedule[1])
+        self.assertEqual(self.ids('/api/schedule-archive/?semester=2'), [])
+
+    def test_admin_lists_rows_of_deleted_references(self):
+        archive.archive_semester(self.syllabus.pk, 1)
+        self.lecturer.delete()
+
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/app/archivedschedule/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 2)
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class ColumnarFormatTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'admin'))
+
+    def test_empty_list_has_empty_columns(self):
+        response = self.client.get('/api/schedule/', {'format': 'columnar'})
+
+        self.assertEqual(response.json(), {
+            'count': 0,
+            'columns': {field: [] for field in ScheduleViewSet.columnar_fields},
+        })
+
+    def test_columns_are_parallel_arrays(self):
+        _, _, schedule = create_schedule()
+        ids = schedule[1] + schedule[2]
+
+        columns = self.client.get('/api/schedule/', {'format': 'columnar'}).json()['columns']
+        packed = msgpack.unpackb(self.client.get('/api/schedule/', {'format': 'msgpack'}).content)
+
+        self.assertEqual(packed, {'count': len(ids), 'columns': columns})
+        self.assertEqual(sorted(columns['id']), ids)
+        for field in ScheduleViewSet.columnar_fields:
+            self.assertEqual(len(columns[field]), len(ids))
+        row = columns['id'].index(schedule[2][0])
+        self.assertEqual((columns['semester'][row], columns['week_day'][row]), (2, 1))
+
+    def test_only_list_has_columnar_formats(self):
+        pk = create_schedule()[2][1][0]
+
+        self.assertEqual(self.client.get(f'/api/schedule/{pk}/', {'format': 'msgpack'}).status_code, 404)
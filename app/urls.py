@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 
 from .views import *
@@ -11,5 +12,9 @@ router.register('lecturers', LecturerViewSet, basename='lecturer')
 router.register('groups', GroupViewSet, basename='group')
 router.register('classrooms', ClassroomViewSet, basename='classroom')
 router.register('schedule', ScheduleViewSet, basename='schedule')
+router.register('schedule-archive', ArchivedScheduleViewSet, basename='archived-schedule')
+router.register('jobs', JobViewSet, basename='job')
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path('search/', SearchView.as_view(), name='search'),
+]
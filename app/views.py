@@ -1,37 +1,219 @@
-from rest_framework import viewsets
+import time
+
+from django.conf import settings
+from rest_framework import mixins, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ParseError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import db_routers, jobs, response_cache, search
+from .renderers import ColumnarJSONRenderer, MessagePackRenderer
 from .serializers import *
 
 
-class DirectionViewSet(viewsets.ModelViewSet):
+class Conflict(APIException):
+    status_code = 409
+    default_detail = 'Conflict'
+    default_code = 'conflict'
+
+
+class ReplicaRoutingMixin:
+    def dispatch(self, request, *args, **kwargs):
+        with db_routers.routing_context():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        db_routers.use_replica(
+            self.action in db_routers.READ_ACTIONS and not db_routers.is_pinned(request.user)
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            db_routers.pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedResponseMixin:
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format == 'api':
+            return handler(request, *args, **kwargs)
+
+        version = response_cache.data_version()
+        encoding = response_cache.negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        cached = response_cache.get(request, request.accepted_media_type, encoding, version)
+        if cached is not None:
+            return cached
+
+        self.response_cache_pending = (version, encoding)
+        return handler(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response_cache.bump_version()
+
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        pending = getattr(self, 'response_cache_pending', None)
+        if pending is None or response.status_code != 200 or not isinstance(response, Response):
+            return response
+
+        version, encoding = pending
+        response.render()
+
+        # A replica may still lag behind a recent change, so do not cache what it returned
+        if db_routers.replica_in_use() and time.time() - version < settings.REPLICA_PIN_SECONDS:
+            return response
+
+        variants = response_cache.store(request, request.accepted_media_type, version, response)
+        return response_cache.build_response(*variants[encoding], encoding, 'MISS')
+
+
+class QueryParamFilterMixin:
+    filter_params = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param in self.filter_params:
+            value = self.request.query_params.get(param)
+            if value is not None:
+                if not value.isdigit():
+                    raise ParseError(f"{param} should be an integer")
+                queryset = queryset.filter(**{param: value})
+        return queryset
+
+
+class ColumnarListMixin:
+    columnar_fields = ()
+    columnar_renderer_classes = (ColumnarJSONRenderer, MessagePackRenderer)
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == 'list':
+            renderers += [renderer() for renderer in self.columnar_renderer_classes]
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        if not isinstance(request.accepted_renderer, self.columnar_renderer_classes):
+            return super().list(request, *args, **kwargs)
+
+        rows = self.filter_queryset(self.get_queryset()).values_list(*self.columnar_fields)
+        columns = list(zip(*rows)) or [()] * len(self.columnar_fields)
+
+        return Response({
+            'count': len(columns[0]),
+            'columns': {field: list(column) for field, column in zip(self.columnar_fields, columns)},
+        })
+
+
+class DirectionViewSet(ReplicaRoutingMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Direction.objects.all()
     serializer_class = DirectionSerializer
 
 
-class SyllabusViewSet(viewsets.ModelViewSet):
+class SyllabusViewSet(ReplicaRoutingMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Syllabus.objects.all()
     serializer_class = SyllabusSerializer
 
 
-class DisciplineViewSet(viewsets.ModelViewSet):
+class DisciplineViewSet(ReplicaRoutingMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Discipline.objects.all()
     serializer_class = DisciplineSerializer
 
 
-class LecturerViewSet(viewsets.ModelViewSet):
+class LecturerViewSet(ReplicaRoutingMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Lecturer.objects.all()
     serializer_class = LecturerSerializer
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(ReplicaRoutingMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
 
-class ClassroomViewSet(viewsets.ModelViewSet):
+class ClassroomViewSet(ReplicaRoutingMixin, CachedResponseMixin, viewsets.ModelViewSet):
     queryset = Classroom.objects.all()
     serializer_class = ClassroomSerializer
 
 
-class ScheduleViewSet(viewsets.ModelViewSet):
+class ScheduleViewSet(ReplicaRoutingMixin, CachedResponseMixin, QueryParamFilterMixin, ColumnarListMixin,
+                      viewsets.ModelViewSet):
     queryset = Schedule.objects.all()
     serializer_class = SchedulesSerializer
+    filter_params = ('syllabus', 'semester', 'group')
+    columnar_fields = (
+        'id', 'syllabus', 'semester', 'group', 'even_week', 'week_day',
+        'period', 'discipline', 'lecturer', 'classroom', 'type',
+    )
+
+
+class ArchivedScheduleViewSet(ReplicaRoutingMixin, CachedResponseMixin, QueryParamFilterMixin, ColumnarListMixin,
+                              viewsets.ReadOnlyModelViewSet):
+    queryset = ArchivedSchedule.objects.all()
+    serializer_class = ArchivedSchedulesSerializer
+    filter_params = ScheduleViewSet.filter_params
+    columnar_fields = ScheduleViewSet.columnar_fields
+
+
+class JobViewSet(mixins.CreateModelMixin,
+                 mixins.ListModelMixin,
+                 mixins.RetrieveModelMixin,
+                 viewsets.GenericViewSet):
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        if not jobs.cancel(job):
+            raise Conflict(f"Job is {job.status}")
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True, methods=['post'])
+    def retry(self, request, pk=None):
+        job = self.get_object()
+        if not jobs.retry(job):
+            raise Conflict(f"Job is {job.status}")
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True)
+    def result(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'done':
+            raise Conflict(f"Job is {job.status}")
+        return Response(job.result)
+
+
+class SearchView(APIView):
+    resource_name = False
+
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), 100))
+        except ValueError:
+            raise ParseError("limit should be an integer")
+
+        results = search.search(request.query_params.get('q', ''), limit)
+
+        return Response({
+            'data': [
+                {
+                    'type': model.__name__,
+                    'id': str(pk),
+                    'attributes': {'label': label, 'score': round(score, 3)},
+                }
+                for model, pk, label, score in results
+            ],
+            'meta': {'count': len(results)},
+        })
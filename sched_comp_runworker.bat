@@ -0,0 +1,4 @@
+@echo off
+call C:\Users\%username%\PycharmProjects\schedule_composer_api\venv\Scripts\activate.bat
+py C:\Users\%username%\PycharmProjects\schedule_composer_api\manage.py runworker
+deactivate
\ No newline at end of file
@@ -8,6 +8,7 @@
 #         'PASSWORD': '',
 #         'HOST': 'localhost',
 #         'PORT': '5432',
+#         'CONN_MAX_AGE': 600,
 #     }
 # }
 #
@@ -19,5 +20,58 @@
 #         'PASSWORD': '',
 #         'HOST': 'localhost',
 #         'PORT': '3306',
+#         'CONN_MAX_AGE': 600,
+#     }
+# }
+#
+# Primary with a read replica. Persistent connections (CONN_MAX_AGE) are checked
+# with a ping at the start of every request and dropped if unusable. For pooling
+# across worker processes point HOST/PORT at PgBouncer (transaction pooling), which
+# requires DISABLE_SERVER_SIDE_CURSORS.
+# MIRROR lets the test runner use two aliases against one local database.
+#
+# DATABASES = {
+#     'default': {
+#         'ENGINE': 'django.db.backends.postgresql_psycopg2',
+#         'NAME': '',
+#         'USER': '',
+#         'PASSWORD': '',
+#         'HOST': 'primary.local',
+#         'PORT': '6432',
+#         'CONN_MAX_AGE': 600,
+#         'DISABLE_SERVER_SIDE_CURSORS': True,
+#     },
+#     'replica': {
+#         'ENGINE': 'django.db.backends.postgresql_psycopg2',
+#         'NAME': '',
+#         'USER': '',
+#         'PASSWORD': '',
+#         'HOST': 'replica.local',
+#         'PORT': '6432',
+#         'CONN_MAX_AGE': 600,
+#         'DISABLE_SERVER_SIDE_CURSORS': True,
+#         'TEST': {'MIRROR': 'default'},
+#     },
+# }
+#
+# DATABASE_REPLICAS = ['replica']
+#
+# Read-your-writes pins and response cache versions are kept in the cache, so it has to be
+# shared between all web and runworker processes (checked as app.E001 when DEBUG is off)
+# (django-redis; the built-in RedisCache needs Django 4.0+)
+#
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django_redis.cache.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379/1',
+#     }
+# }
+#
+# Without Redis the database cache ships with Django (run createcachetable first)
+#
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+#         'LOCATION': 'response_cache',
 #     }
 # }
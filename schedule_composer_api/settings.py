@@ -37,13 +37,14 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 
     'rest_framework',
     'rest_framework.authtoken',
     'djoser',
     'corsheaders',
 
-    'app'
+    'app.apps.ScaAppConfig'
 ]
 
 MIDDLEWARE = [
@@ -90,6 +91,17 @@ WSGI_APPLICATION = 'schedule_composer_api.wsgi.application'
 #     }
 # }
 
+DATABASE_ROUTERS = ['app.db_routers.PrimaryReplicaRouter']
+
+# Aliases from DATABASES that serve list/retrieve requests
+DATABASE_REPLICAS = []
+
+# Seconds a client reads from the primary after a write (read-your-writes)
+REPLICA_PIN_SECONDS = 5
+
+# Seconds a rendered and precompressed list/retrieve response is kept in the cache
+RESPONSE_CACHE_TIMEOUT = 60 * 60
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -0,0 +1,24 @@
+# Primary plus a replica alias mirrored onto it, for running the test suite locally:
+#
+#   python manage.py test --settings=schedule_composer_api.test_settings
+
+from .settings import *
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than shared in-memory database, so the mirror can read while the default writes
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_REPLICAS = ['replica']
+
+# The test runner is a single process, so the process-local cache is fine here
+SILENCED_SYSTEM_CHECKS = ['app.W001', 'app.E001']